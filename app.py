@@ -1,7 +1,15 @@
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
 import os
-import uuid
-from datetime import datetime
+
+# Use oneDNN-optimized TensorFlow CPU kernels; must be set before TensorFlow is imported
+os.environ.setdefault('TF_ENABLE_ONEDNN_OPTS', '1')
+
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask_session import Session
+from cachelib import FileSystemCache
+import secrets
+import time
+from datetime import datetime, timezone
+from types import MappingProxyType
 from services.ai_service import AIService
 from services.insight_engine import InsightEngine
 from utils.image_processing import save_uploaded_image, allowed_file
@@ -9,9 +17,21 @@ from utils.image_processing import save_uploaded_image, allowed_file
 # Initialize Flask app
 app = Flask(__name__)
 app.config.from_object('config.Config')
+app.config['SESSION_CACHELIB'] = FileSystemCache(
+    cache_dir=app.config['SESSION_DIR'],
+    threshold=app.config['SESSION_THRESHOLD'],
+    default_timeout=app.config['PERMANENT_SESSION_LIFETIME']
+)
+Session(app)
 
 # Initialize services
-ai_service = AIService(app.config['MODEL_PATH'])
+ai_service = AIService(
+    app.config['MODEL_PATH'],
+    app.config['MODEL_SERVER_URL'],
+    jit_compile=app.config['MODEL_JIT_COMPILE'],
+    threads=app.config['AI_THREADS'],
+    processes=app.config['AI_PROCESSES']
+)
 insight_engine = InsightEngine()
 
 # Ensure upload directory exists
@@ -303,6 +323,31 @@ QUESTIONNAIRES = {
     }
 }
 
+# Flat question names per prediction type, used to collect form responses
+_QUESTION_NAMES = {
+    prediction_type: tuple(
+        question_name
+        for section in questionnaire['sections'].values()
+        for question_name in section['questions']
+    )
+    for prediction_type, questionnaire in QUESTIONNAIRES.items()
+}
+
+# Questionnaires are shared across requests, so expose them read-only
+QUESTIONNAIRES = MappingProxyType(QUESTIONNAIRES)
+
+# Rendered questionnaire forms, keyed by prediction type
+_RENDERED_QUESTIONNAIRE_FORMS = {}
+
+def _render_questionnaire_form(prediction_type):
+    """Render the static questionnaire form once per prediction type"""
+    form_html = _RENDERED_QUESTIONNAIRE_FORMS.get(prediction_type)
+    if form_html is None:
+        form_html = render_template('_questionnaire_form.html',
+                                    questionnaire=QUESTIONNAIRES[prediction_type])
+        _RENDERED_QUESTIONNAIRE_FORMS[prediction_type] = form_html
+    return form_html
+
 @app.route('/')
 def index():
     """Home page"""
@@ -327,17 +372,20 @@ def predict():
             return render_template('prediction.html', error='Invalid file type. Please upload PNG, JPG, or JPEG.')
         
         try:
+            # Read the upload once and reuse the bytes for saving and inference
+            image_data = file.read()
+            
             # Save uploaded image
-            filename = save_uploaded_image(file, app.config['UPLOAD_FOLDER'])
+            filename = save_uploaded_image(image_data, file.filename, app.config['UPLOAD_FOLDER'])
             file_path = f"uploads/{filename}"
             
             # Make prediction
-            prediction_result = ai_service.predict(file)
+            prediction_result = ai_service.predict(image_data)
             
             # Store in session
             session['prediction'] = prediction_result
             session['image_path'] = file_path
-            session['prediction_id'] = str(uuid.uuid4())
+            session['prediction_id'] = secrets.token_urlsafe(12)
             
             # Redirect to questionnaire
             return redirect(url_for('questionnaire'))
@@ -347,6 +395,30 @@ def predict():
     
     return render_template('prediction.html')
 
+@app.route('/api/predict-batch', methods=['POST'])
+def predict_batch():
+    """Predict several uploaded images with a single forward pass"""
+    files = request.files.getlist('images')
+    
+    if not files or any(file.filename == '' for file in files):
+        return jsonify({'error': 'No file selected'}), 400
+    
+    if len(files) > app.config['MAX_BATCH_SIZE']:
+        return jsonify({'error': f"At most {app.config['MAX_BATCH_SIZE']} images per request"}), 400
+    
+    if not all(allowed_file(file.filename) for file in files):
+        return jsonify({'error': 'Invalid file type. Please upload PNG, JPG, or JPEG.'}), 400
+    
+    try:
+        predictions = ai_service.predict_batch([file.read() for file in files])
+    except Exception as e:
+        return jsonify({'error': f'Error processing images: {str(e)}'}), 500
+    
+    # Undecodable images carry a per-item error; fail the request if none could be scored
+    if all('error' in prediction for prediction in predictions):
+        return jsonify({'predictions': predictions}), 400
+    return jsonify({'predictions': predictions})
+
 @app.route('/questionnaire', methods=['GET', 'POST'])
 def questionnaire():
     """Dynamic questionnaire based on prediction"""
@@ -362,10 +434,11 @@ def questionnaire():
     
     if request.method == 'POST':
         # Collect form responses
-        responses = {}
-        for section_name, section in questionnaire_data['sections'].items():
-            for question_name in section['questions']:
-                responses[question_name] = request.form.get(question_name, '')
+        form = request.form
+        responses = {
+            question_name: form.get(question_name, '')
+            for question_name in _QUESTION_NAMES[prediction_type]
+        }
         
         # Store responses in session
         session['responses'] = responses
@@ -381,7 +454,7 @@ def questionnaire():
         return redirect(url_for('insights'))
     
     return render_template('questionnaire.html', 
-                            questionnaire=questionnaire_data,
+                            questionnaire_form=_render_questionnaire_form(prediction_type),
                             prediction_type=prediction_type,
                             prediction=session['prediction'])
 
@@ -403,12 +476,24 @@ def new_analysis():
     session.clear()
     return redirect(url_for('predict'))
 
+# Health check timestamp as (epoch second, ISO string), refreshed at most once per
+# second; the tuple is replaced in one assignment so readers never see a torn pair
+_health_timestamp = (0, '')
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint"""
+    global _health_timestamp
+    
+    now = int(time.time())
+    cached_second, timestamp = _health_timestamp
+    if now != cached_second:
+        timestamp = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        _health_timestamp = (now, timestamp)
+    
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': timestamp
     })
 
 # Error handlers
@@ -8,10 +8,23 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     DEBUG = os.getenv('DEBUG', False)
     
+    # Server-side sessions (the cookie only carries the session id); the
+    # cachelib store itself is built in app.py
+    SESSION_TYPE = 'cachelib'
+    SESSION_DIR = os.getenv('SESSION_DIR', 'flask_session')
+    SESSION_THRESHOLD = int(os.getenv('SESSION_THRESHOLD', 10000))  # stored sessions before the oldest are evicted
+    PERMANENT_SESSION_LIFETIME = 3600
+    
     # File Upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'bmp'}
     UPLOAD_FOLDER = 'static/uploads'
+    MAX_BATCH_SIZE = 16  # images per /api/predict-batch request
     
     # AI Model
-    MODEL_PATH = os.getenv('MODEL_PATH', 'final_combined_model.keras')
\ No newline at end of file
+    MODEL_PATH = os.getenv('MODEL_PATH', 'final_combined_model.keras')
+    MODEL_JIT_COMPILE = os.getenv('MODEL_JIT_COMPILE', 'False').lower() == 'true'  # XLA for the Keras model
+    AI_THREADS = int(os.getenv('AI_THREADS', 2))  # concurrent inference threads per process
+    AI_PROCESSES = int(os.getenv('AI_PROCESSES', 1))  # server processes sharing the CPU (set by gunicorn.conf.py)
+    # TensorFlow Serving model URL, e.g. http://localhost:8501/v1/models/breast_cancer_cnn
+    MODEL_SERVER_URL = os.getenv('MODEL_SERVER_URL')
\ No newline at end of file
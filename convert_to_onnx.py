@@ -0,0 +1,42 @@
+"""Convert the Keras CNN to ONNX for ONNX Runtime inference.
+
+Usage: python convert_to_onnx.py [keras_model] [output.onnx]
+
+Requires tf2onnx (pip install tf2onnx), which is only needed for this
+offline step. Point MODEL_PATH at the generated .onnx file to serve it
+through ONNX Runtime in AIService; the serving deployment then also needs
+onnxruntime (pip install onnxruntime==1.20.1), which is not in
+requirements.txt because other deployments never import it.
+"""
+import os
+import sys
+
+import tensorflow as tf
+import tf2onnx
+
+from config import Config
+
+ONNX_OPSET = 17
+
+
+def convert(model_path, output_path):
+    model = tf.keras.models.load_model(model_path, compile=False)
+    input_signature = [tf.TensorSpec((None, 224, 224, 1), tf.float32, name='input')]
+    
+    # tf2onnx's from_keras can't trace Keras 3 models (tensorflow>=2.16), so
+    # convert the traced inference function instead
+    forward = tf.function(lambda x: model(x, training=False), input_signature=input_signature)
+    
+    tf2onnx.convert.from_function(
+        forward,
+        input_signature=input_signature,
+        opset=ONNX_OPSET,
+        output_path=output_path
+    )
+    print(f"Saved ONNX model to {output_path}")
+
+
+if __name__ == '__main__':
+    model_path = sys.argv[1] if len(sys.argv) > 1 else Config.MODEL_PATH
+    output_path = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(model_path)[0] + '.onnx'
+    convert(model_path, output_path)
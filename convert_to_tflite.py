@@ -0,0 +1,67 @@
+"""Convert the Keras CNN to a full-integer (int8) TFLite model.
+
+Usage: python convert_to_tflite.py calibration_dir [keras_model] [output.tflite]
+
+calibration_dir should hold representative mammogram images (PNG, JPG,
+JPEG or BMP); other files in it are skipped. Point MODEL_PATH at the generated .tflite file to serve it through the
+TFLite interpreter in AIService.
+"""
+import glob
+import os
+import sys
+
+import tensorflow as tf
+
+from config import Config
+from services.ai_service import preprocess_image_bytes
+from utils.image_processing import allowed_file
+
+MAX_CALIBRATION_IMAGES = 100
+
+
+def load_calibration_image(path):
+    """Preprocess an image exactly like AIService.preprocess_image"""
+    with open(path, 'rb') as f:
+        return preprocess_image_bytes(tf.constant(f.read())).numpy()
+
+
+def calibration_paths(calibration_dir):
+    """List the image files in the calibration directory"""
+    paths = sorted(
+        path for path in glob.glob(os.path.join(calibration_dir, '*'))
+        if os.path.isfile(path) and allowed_file(path)
+    )[:MAX_CALIBRATION_IMAGES]
+    if not paths:
+        raise RuntimeError(f"No calibration images found in {calibration_dir}")
+    return paths
+
+
+def representative_dataset(paths):
+    """Yield preprocessed images used to calibrate the int8 ranges"""
+    for path in paths:
+        yield [load_calibration_image(path)]
+
+
+def convert(calibration_dir, model_path, output_path):
+    paths = calibration_paths(calibration_dir)
+    model = tf.keras.models.load_model(model_path, compile=False)
+    
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = lambda: representative_dataset(paths)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+    print(f"Saved int8 TFLite model to {output_path}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    calibration_dir = sys.argv[1]
+    model_path = sys.argv[2] if len(sys.argv) > 2 else Config.MODEL_PATH
+    output_path = sys.argv[3] if len(sys.argv) > 3 else os.path.splitext(model_path)[0] + '.tflite'
+    convert(calibration_dir, model_path, output_path)
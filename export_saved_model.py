@@ -0,0 +1,54 @@
+"""Export the Keras CNN as a SavedModel for TensorFlow Serving.
+
+Usage: python export_saved_model.py [keras_model] [export_base_dir]
+
+The serving signature takes encoded image bytes, so preprocessing runs in
+the sidecar and the Flask workers never hold the model weights:
+
+    docker run -p 8501:8501 \
+        -v "$PWD/serving/breast_cancer_cnn:/models/breast_cancer_cnn" \
+        -e MODEL_NAME=breast_cancer_cnn tensorflow/serving
+
+then set MODEL_SERVER_URL=http://localhost:8501/v1/models/breast_cancer_cnn.
+"""
+import os
+import sys
+
+import tensorflow as tf
+
+from config import Config
+from services.ai_service import preprocess_image_bytes
+
+EXPORT_BASE_DIR = 'serving/breast_cancer_cnn'
+EXPORT_VERSION = '1'
+
+
+class ServingModule(tf.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+    
+    @tf.function(input_signature=[tf.TensorSpec([None], tf.string, name='images')])
+    def serve(self, images):
+        """Preprocess a batch of encoded images and score them"""
+        batch = tf.map_fn(
+            lambda raw: preprocess_image_bytes(raw)[0],
+            images,
+            fn_output_signature=tf.TensorSpec([224, 224, 1], tf.float32)
+        )
+        return {'scores': self.model(batch, training=False)}
+
+
+def export(model_path, export_base_dir):
+    model = tf.keras.models.load_model(model_path, compile=False)
+    module = ServingModule(model)
+    
+    export_dir = os.path.join(export_base_dir, EXPORT_VERSION)
+    tf.saved_model.save(module, export_dir, signatures={'serving_default': module.serve})
+    print(f"Saved serving model to {export_dir}")
+
+
+if __name__ == '__main__':
+    model_path = sys.argv[1] if len(sys.argv) > 1 else Config.MODEL_PATH
+    export_base_dir = sys.argv[2] if len(sys.argv) > 2 else EXPORT_BASE_DIR
+    export(model_path, export_base_dir)
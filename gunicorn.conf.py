@@ -0,0 +1,27 @@
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+
+# With the TensorFlow Serving sidecar the workers only do I/O, so use the usual
+# 2N+1. With the model in-process every worker holds its own copy of the weights
+# and its own inference threads, so default to one worker per core: fewer
+# workers means less memory but fewer concurrent requests.
+if os.getenv('MODEL_SERVER_URL'):
+    default_workers = multiprocessing.cpu_count() * 2 + 1
+else:
+    default_workers = multiprocessing.cpu_count()
+workers = int(os.getenv('WEB_CONCURRENCY', default_workers))
+
+# Workers inherit this and split the cores between them (see AIService), so
+# workers * AI_THREADS inference threads never oversubscribe the CPU
+os.environ.setdefault('AI_PROCESSES', str(workers))
+
+timeout = 120  # model loading and inference can be slow on cold workers
+
+# Load the app once in the master and share it copy-on-write with the workers.
+# TensorFlow's runtime is not fork-safe once it has executed ops (its thread
+# pools don't survive the fork), so by default this is only enabled when the
+# model runs in the TensorFlow Serving sidecar (MODEL_SERVER_URL) and the
+# master never touches the TF runtime. Set PRELOAD_APP to override.
+preload_app = os.getenv('PRELOAD_APP', str(bool(os.getenv('MODEL_SERVER_URL')))).lower() == 'true'
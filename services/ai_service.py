@@ -1,82 +1,354 @@
 import tensorflow as tf
 import numpy as np
-from PIL import Image
+import base64
+import hashlib
+import json
 import logging
 import os
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
+MODEL_SERVER_TIMEOUT = 30  # seconds
+RESULT_CACHE_SIZE = 1024
+RESULT_CACHE_TTL = 3600  # seconds
+INVALID_IMAGE_ERROR = 'Invalid or corrupt image'
+
+def _decode_jpeg_downscaled(raw):
+    """Let libjpeg shrink large JPEGs by 2/4/8 during decode, keeping the short side >= 224"""
+    shape = tf.io.extract_jpeg_shape(raw)
+    scale = tf.minimum(shape[0], shape[1]) // 224
+    return tf.case([
+        (scale >= 8, lambda: tf.io.decode_jpeg(raw, channels=3, ratio=8)),
+        (scale >= 4, lambda: tf.io.decode_jpeg(raw, channels=3, ratio=4)),
+        (scale >= 2, lambda: tf.io.decode_jpeg(raw, channels=3, ratio=2)),
+    ], default=lambda: tf.io.decode_jpeg(raw, channels=3))
+
+@tf.function(input_signature=[tf.TensorSpec([], tf.string)])
+def preprocess_image_bytes(raw):
+    """Decode, grayscale, resize and normalize an encoded image in one traced graph"""
+    # Decode as RGB so every supported format (including BMP) takes the same path
+    image = tf.cond(
+        tf.io.is_jpeg(raw),
+        lambda: _decode_jpeg_downscaled(raw),
+        lambda: tf.io.decode_image(raw, channels=3, expand_animations=False)
+    )
+    image = tf.image.rgb_to_grayscale(image)
+    
+    # Resize to model input size with an antialiased bicubic filter, matching the
+    # PIL Image.resize path the model was served with; bicubic can overshoot, so
+    # clamp back to the pixel range like PIL's uint8 output
+    image = tf.image.resize(image, [224, 224], method='bicubic', antialias=True)
+    image = tf.clip_by_value(image, 0.0, 255.0)
+    
+    # Normalize in float32 (resize already outputs float32) and add batch dimension
+    return image[tf.newaxis] * (1.0 / 255.0)
+
 class AIService:
-    def __init__(self, model_path):
+    def __init__(self, model_path, model_server_url=None, jit_compile=False, threads=2, processes=1):
         self.model_path = model_path
+        self.model_server_url = model_server_url.rstrip('/') if model_server_url else None
+        self.jit_compile = jit_compile
+        
+        # Dedicated inference threads bound concurrency on the shared model
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='ai')
+        # Cores are shared by every inference thread in every server process
+        self._intra_op_threads = max(1, (os.cpu_count() or 1) // (threads * processes))
+        self._configure_threading(threads)
+        
+        # Recent results keyed by image content hash, so re-uploads skip the model
+        self._result_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+        self._result_cache_lock = threading.Lock()
+        
         self.model = None
+        self._infer = None
+        self._infer_batch = None
+        self.interpreter = None
+        self._interpreter_lock = threading.Lock()
+        self.session = None
         self._load_model()
     
+    def _configure_threading(self, threads):
+        """Split CPU cores between the inference threads to avoid oversubscription"""
+        try:
+            tf.config.threading.set_inter_op_parallelism_threads(threads)
+            tf.config.threading.set_intra_op_parallelism_threads(self._intra_op_threads)
+        except RuntimeError as e:
+            # TensorFlow was already initialized by someone else
+            logger.warning(f"Could not configure TensorFlow threading: {e}")
+    
     def _load_model(self):
         """Load the TensorFlow model"""
         try:
+            # Inference runs in the TensorFlow Serving sidecar, keep workers weight-free
+            if self.model_server_url:
+                logger.info(f"Using model server at {self.model_server_url}")
+                return
+            
             if not os.path.exists(self.model_path):
                 logger.warning(f"Model file not found: {self.model_path}. Using mock predictions.")
                 return
             
             logger.info(f"Loading model from {self.model_path}")
+            
+            # Quantized TFLite models are run through the interpreter instead of Keras
+            if self.model_path.endswith('.tflite'):
+                self._load_tflite_model(self._intra_op_threads)
+                logger.info("TFLite model loaded successfully")
+                self._warm_up()
+                return
+            
+            # ONNX models load as a flat protobuf without rebuilding the Keras graph
+            if self.model_path.endswith('.onnx'):
+                self._load_onnx_model(self._intra_op_threads)
+                logger.info("ONNX model loaded successfully")
+                self._warm_up()
+                return
+            
             self.model = tf.keras.models.load_model(self.model_path, compile=False)
+            
+            # Trace the forward pass once for a single 224x224 grayscale image so
+            # predictions skip the Keras predict() loop on every request; XLA can
+            # optionally fuse the conv/BN/activation chains
+            self._infer = tf.function(
+                lambda x: self.model(x, training=False),
+                input_signature=[tf.TensorSpec((1, 224, 224, 1), tf.float32)],
+                jit_compile=self.jit_compile
+            ).get_concrete_function()
+            self._infer_batch = tf.function(
+                lambda x: self.model(x, training=False),
+                input_signature=[tf.TensorSpec((None, 224, 224, 1), tf.float32)],
+                jit_compile=self.jit_compile
+            ).get_concrete_function()
             logger.info("Model loaded successfully")
+            self._warm_up()
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             logger.info("Falling back to mock predictions")
     
+    def _warm_up(self):
+        """Run a dummy forward pass so the first request doesn't pay for kernel setup"""
+        try:
+            preprocess_image_bytes.get_concrete_function()
+            self._run_model(tf.zeros((1, 224, 224, 1), dtype=tf.float32))
+        except Exception as e:
+            logger.warning(f"Model warm-up failed: {e}")
+    
+    def _load_tflite_model(self, num_threads):
+        """Load an int8 TFLite model (XNNPACK is applied by the default op resolver)"""
+        self.interpreter = tf.lite.Interpreter(
+            model_path=self.model_path,
+            num_threads=num_threads
+        )
+        self.interpreter.allocate_tensors()
+        self._input_details = self.interpreter.get_input_details()[0]
+        self._output_details = self.interpreter.get_output_details()[0]
+    
+    def _load_onnx_model(self, num_threads):
+        """Load an ONNX model into an ONNX Runtime CPU session"""
+        import onnxruntime as ort
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            self.model_path,
+            options,
+            providers=['CPUExecutionProvider']
+        )
+        self._onnx_input_name = self.session.get_inputs()[0].name
+    
+    @property
+    def model_loaded(self):
+        """Whether a local model backend is available for inference"""
+        return self._infer is not None or self.interpreter is not None or self.session is not None
+    
+    def _run_model(self, processed_image):
+        """Run a forward pass and return the raw prediction score"""
+        if self.session is not None:
+            processed_image = np.asarray(processed_image, dtype=np.float32)
+            return self.session.run(None, {self._onnx_input_name: processed_image})[0][0][0]
+        
+        if self.interpreter is None:
+            return self._infer(tf.convert_to_tensor(processed_image, dtype=tf.float32))[0, 0].numpy()
+        
+        processed_image = np.asarray(processed_image)
+        
+        # Quantize the input with the scale/zero point baked into the model
+        input_scale, input_zero_point = self._input_details['quantization']
+        input_dtype = self._input_details['dtype']
+        if input_scale:
+            info = np.iinfo(input_dtype)
+            processed_image = np.clip(
+                np.round(processed_image / input_scale + input_zero_point), info.min, info.max
+            )
+        
+        # The interpreter's tensors are shared, so only one thread may invoke it at a time
+        with self._interpreter_lock:
+            self.interpreter.set_tensor(self._input_details['index'], processed_image.astype(input_dtype))
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self._output_details['index'])[0][0]
+        
+        # Dequantize the output back to a probability
+        output_scale, output_zero_point = self._output_details['quantization']
+        if output_scale:
+            output = (float(output) - output_zero_point) * output_scale
+        return output
+    
+    def _run_model_batch(self, processed_images):
+        """Run a forward pass over an (N, 224, 224, 1) batch and return N raw scores"""
+        if self.session is not None:
+            processed_images = np.asarray(processed_images, dtype=np.float32)
+            return self.session.run(None, {self._onnx_input_name: processed_images})[0][:, 0]
+        
+        if self.interpreter is None:
+            return self._infer_batch(tf.convert_to_tensor(processed_images, dtype=tf.float32))[:, 0].numpy()
+        
+        # The TFLite interpreter is allocated for a single image
+        processed_images = np.asarray(processed_images)
+        return [self._run_model(image[np.newaxis]) for image in processed_images]
+    
+    def _predict_remote(self, raws):
+        """Score a list of encoded images on the TensorFlow Serving REST API"""
+        payload = json.dumps({
+            'signature_name': 'serving_default',
+            'instances': [{'b64': base64.b64encode(raw).decode('ascii')} for raw in raws]
+        }).encode('utf-8')
+        request = urllib.request.Request(
+            f"{self.model_server_url}:predict",
+            data=payload,
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=MODEL_SERVER_TIMEOUT) as response:
+            predictions = json.load(response)['predictions']
+        return [prediction[0] for prediction in predictions]
+    
+    @staticmethod
+    def _read_image_bytes(image_file):
+        """Return the encoded bytes of an upload (raw bytes or file upload)"""
+        return image_file if isinstance(image_file, bytes) else image_file.stream.read()
+    
     def preprocess_image(self, image_file):
-        """Preprocess uploaded image for prediction"""
+        """Preprocess uploaded image (raw bytes or file upload) for prediction"""
         try:
-            image = Image.open(image_file.stream)
-            
-            # Convert to grayscale if needed
-            if image.mode != 'L':
-                image = image.convert('L')
-            
-            # Resize to model input size
-            image = image.resize((224, 224))
-            
-            # Convert to numpy array and normalize
-            image_array = np.array(image) / 255.0
-            
-            # Add batch and channel dimensions
-            image_array = image_array[np.newaxis, ..., np.newaxis]
-            
-            return image_array
+            raw = self._read_image_bytes(image_file)
+            return preprocess_image_bytes(tf.constant(raw))
         except Exception as e:
             logger.error(f"Image preprocessing error: {e}")
             raise
     
     def predict(self, image_file):
-        """Make prediction on uploaded image"""
+        """Make prediction on uploaded image (raw bytes or file upload)"""
+        return self._pool.submit(self._predict, image_file).result()
+    
+    def predict_batch(self, image_files):
+        """Make predictions on several uploaded images with a single forward pass"""
+        return self._pool.submit(self._predict_batch, image_files).result()
+    
+    def _predict(self, image_file):
         try:
             # If model is not loaded, use mock prediction
-            if self.model is None:
+            if not self.model_server_url and not self.model_loaded:
                 return self._mock_prediction()
             
-            # Preprocess image
-            processed_image = self.preprocess_image(image_file)
-            
-            # Make prediction
-            prediction = self.model.predict(processed_image, verbose=0)[0][0]
+            raw = self._read_image_bytes(image_file)
+            cache_key = hashlib.blake2b(raw, digest_size=16).hexdigest()
+            with self._result_cache_lock:
+                cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
             
-            # Calculate confidence and result
-            confidence = float(abs(prediction - 0.5) + 0.5)
-            result = "malignant" if prediction > 0.5 else "benign"
+            if self.model_server_url:
+                # The sidecar decodes and preprocesses the raw image itself
+                prediction = self._predict_remote([raw])[0]
+            else:
+                # Preprocess image
+                processed_image = self.preprocess_image(raw)
+                
+                # Make prediction
+                prediction = self._run_model(processed_image)
             
-            return {
-                'result': result,
-                'confidence': confidence,
-                'prediction_score': float(prediction),
-                'message': f"Prediction: {result.upper()} with {confidence:.1%} confidence"
-            }
+            result = self._format_prediction(prediction)
+            with self._result_cache_lock:
+                self._result_cache[cache_key] = result
+            return dict(result)
             
         except Exception as e:
             logger.error(f"Prediction error: {e}")
             return self._mock_prediction()
     
+    def _predict_batch(self, image_files):
+        """Predict each image, or return {'error': ...} for images that cannot be decoded.
+        
+        Model failures are raised rather than replaced with mock predictions.
+        """
+        raws = [self._read_image_bytes(f) for f in image_files]
+        
+        if self.model_server_url:
+            return self._predict_remote_batch(raws)
+        
+        if not self.model_loaded:
+            return [self._mock_prediction() for _ in raws]
+        
+        # Decode every image up front so one bad upload only fails its own slot
+        results = [None] * len(raws)
+        processed_images = []
+        indices = []
+        for index, raw in enumerate(raws):
+            try:
+                processed_images.append(self.preprocess_image(raw))
+                indices.append(index)
+            except Exception:
+                results[index] = {'error': INVALID_IMAGE_ERROR}
+        
+        if processed_images:
+            # Stack the preprocessed images into one (N, 224, 224, 1) batch
+            predictions = self._run_model_batch(tf.concat(processed_images, axis=0))
+            for index, prediction in zip(indices, predictions):
+                results[index] = self._format_prediction(prediction)
+        return results
+    
+    def _predict_remote_batch(self, raws):
+        """Score images on the model server, isolating instances it rejects"""
+        if len(raws) > 1:
+            try:
+                return [self._format_prediction(prediction) for prediction in self._predict_remote(raws)]
+            except urllib.error.HTTPError as e:
+                # TF Serving fails the whole request when any instance cannot be decoded
+                if e.code != 400:
+                    raise
+                logger.warning("Model server rejected the batch, scoring images individually")
+        
+        results = []
+        for raw in raws:
+            try:
+                results.append(self._format_prediction(self._predict_remote([raw])[0]))
+            except urllib.error.HTTPError as e:
+                if e.code != 400:
+                    raise
+                results.append({'error': INVALID_IMAGE_ERROR})
+        return results
+    
+    def _format_prediction(self, prediction):
+        """Build the prediction result from a raw model score"""
+        # Convert the NumPy/JSON score once, then work with Python floats
+        score = float(prediction)
+        
+        # Calculate confidence and result
+        confidence = 0.5 + abs(score - 0.5)
+        result = "malignant" if score > 0.5 else "benign"
+        
+        return {
+            'result': result,
+            'confidence': confidence,
+            'prediction_score': score,
+            'message': f"Prediction: {result.upper()} with {confidence:.1%} confidence"
+        }
+    
     def _mock_prediction(self):
         """Provide mock prediction when model is not available"""
         import random
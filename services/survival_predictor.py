@@ -1,94 +1,349 @@
-import pandas as pd
 import numpy as np
 import joblib
 import logging
-from typing import Dict, Any
+from bisect import bisect_right
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
 import os
+import threading
+from cachetools import LRUCache
 
 logger = logging.getLogger(__name__)
 
+# Loaded models (plus their precomputed encoder lookups) shared by all instances, keyed by path
+_MODEL_CACHE: Dict[str, Dict[str, Any]] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+# Survival predictions keyed by (model path, sorted mapped features); questionnaires
+# only produce a limited set of distinct feature combinations
+_PREDICTION_CACHE = LRUCache(maxsize=4096)
+_PREDICTION_CACHE_LOCK = threading.Lock()
+
+# Survival message thresholds (percent) and the message for each band
+_SURVIVAL_THRESHOLDS = (40, 60, 80)
+_SURVIVAL_MESSAGES = (
+    "Requires intensive treatment and close monitoring",
+    "Moderate prognosis - aggressive treatment recommended",
+    "Good prognosis with comprehensive treatment plan",
+    "Excellent prognosis with current treatment approaches"
+)
+
+# Mock survival heuristics, used when the model is unavailable
+_MOCK_STAGE_ADJUSTMENTS = {
+    'Stage I': 15,
+    'Stage II': 0,
+    'Stage III': -20,
+    'Stage IV': -40
+}
+_RNG = np.random.default_rng()
+
+# Confidence bands: above 50% is medium, above 70% is high
+_CONFIDENCE_THRESHOLDS = (50, 70)
+_CONFIDENCE_LEVELS = ('low', 'medium', 'high')
+
+def _postprocess_survival(predictions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Clip and round raw predictions and compute their confidence and message band indices"""
+    clipped = np.clip(predictions, 0, 100)
+    confidence_indices = np.searchsorted(_CONFIDENCE_THRESHOLDS, clipped, side='left')
+    message_indices = np.searchsorted(_SURVIVAL_THRESHOLDS, clipped, side='right')
+    return np.round(clipped, 1), confidence_indices, message_indices
+
+# Accepted questionnaire answers per field; anything else (including 'Not sure')
+# maps to the field's default in _FIELD_SPEC
+_ALLOWED_AGE = frozenset({
+    'Under 30',
+    '30-39',
+    '40-49',
+    '50-59',
+    '60-69',
+    '70 and above'
+})
+
+_ALLOWED_MENOPAUSAL = frozenset({
+    'Pre-menopausal',
+    'Peri-menopausal',
+    'Post-menopausal'
+})
+
+_ALLOWED_STAGE = frozenset({
+    'Stage I',
+    'Stage II',
+    'Stage III',
+    'Stage IV'
+})
+
+_ALLOWED_TUMOR_SIZE = frozenset({
+    'Less than 2 cm',
+    '2-5 cm',
+    'Greater than 5 cm'
+})
+
+_ALLOWED_TUMOR_TYPE = frozenset({
+    'Invasive Ductal Carcinoma (IDC)',
+    'Invasive Lobular Carcinoma (ILC)',
+    'Ductal Carcinoma In Situ (DCIS)',
+    'Other'
+})
+
+_ALLOWED_TUMOR_GRADE = frozenset({
+    'Grade 1 (Well-differentiated)',
+    'Grade 2 (Moderately differentiated)',
+    'Grade 3 (Poorly differentiated)'
+})
+
+_ALLOWED_LYMPH = frozenset({
+    'Positive',
+    'Negative'
+})
+
+_ALLOWED_RECEPTOR = frozenset({
+    'Positive',
+    'Negative'
+})
+
+_ALLOWED_DIAGNOSIS = frozenset({
+    'Less than 1 month',
+    '1-3 months',
+    '3-6 months',
+    'Over 6 months'
+})
+
+_ALLOWED_TREATMENT = frozenset({
+    'Surgery',
+    'Chemotherapy',
+    'Radiation therapy',
+    'Hormone therapy',
+    'Targeted therapy'
+})
+
+_ALLOWED_DURATION = frozenset({
+    'Less than 3 months',
+    '3-6 months',
+    '6-12 months',
+    'Over 12 months',
+    'Not applicable'
+})
+
+_ALLOWED_STATUS = frozenset({
+    'Ongoing',
+    'Completed',
+    'Not started'
+})
+
+_ALLOWED_FOLLOWUP = frozenset({
+    'Every month',
+    'Every 3 months',
+    'Every 6 months',
+    'Yearly',
+    'Not regularly'
+})
+
+_ALLOWED_ACTIVITY = frozenset({
+    'Sedentary (little or no exercise)',
+    'Lightly active (light exercise/sports 1-3 days/week)',
+    'Moderately active (moderate exercise/sports 3-5 days/week)',
+    'Very active (hard exercise/sports 6-7 days a week)'
+})
+
+_ALLOWED_BMI = frozenset({
+    'Below 18.5 (Underweight)',
+    '18.5-24.9 (Normal weight)',
+    '25-29.9 (Overweight)',
+    '30 and above (Obese)'
+})
+
+_ALLOWED_HEALTH = frozenset({
+    'Excellent',
+    'Good',
+    'Fair',
+    'Poor'
+})
+
+# (questionnaire key, survival model feature, accepted answers or None for pass-through, default)
+_FIELD_SPEC: Tuple[Tuple[str, str, Optional[FrozenSet[str]], str], ...] = (
+    ('age_group', 'Age (in years): ', _ALLOWED_AGE, '40-49'),
+    ('ethnicity', 'Ethnicity', None, 'Unknown'),
+    ('marital_status', 'Marital Status', None, 'Unknown'),
+    ('family_history', 'Family History of Breast Cancer: ', None, 'No'),
+    ('menopausal_status', 'Menopausal Status: ', _ALLOWED_MENOPAUSAL, 'Pre-menopausal'),
+    ('other_conditions', 'Other Chronic Conditions (check all that apply): ', None, 'None'),
+    ('cancer_stage', 'Stage of Breast Cancer at Diagnosis (if applicable): ', _ALLOWED_STAGE, 'Stage II'),
+    ('tumor_size', 'Tumor Size: ', _ALLOWED_TUMOR_SIZE, '2-5 cm'),
+    ('tumor_type', 'Tumor Type: ', _ALLOWED_TUMOR_TYPE, 'Invasive Ductal Carcinoma (IDC)'),
+    ('tumor_grade', 'Tumor Grade: ', _ALLOWED_TUMOR_GRADE, 'Grade 2 (Moderately differentiated)'),
+    ('cancer_stage', 'Tumor Stage: ', _ALLOWED_STAGE, 'Stage II'),
+    ('lymph_node_status', 'Lymph Node Status: ', _ALLOWED_LYMPH, 'Unknown'),
+    ('er_status', 'Estrogen Receptor (ER) Status: ', _ALLOWED_RECEPTOR, 'Unknown'),
+    ('pr_status', 'Progesterone Receptor (PR) Status: ', _ALLOWED_RECEPTOR, 'Unknown'),
+    ('her2_status', 'Human Epidermal Growth Factor Receptor 2 (HER2) Status: ', _ALLOWED_RECEPTOR, 'Unknown'),
+    ('diagnosis_to_treatment', 'Duration from Diagnosis to Commencement of Treatment: ', _ALLOWED_DIAGNOSIS, '1-3 months'),
+    ('recurrence', 'Have you experienced a recurrence of breast cancer? ', None, 'No'),
+    ('treatment_types', 'Type of Treatment Received (check all that apply): ', _ALLOWED_TREATMENT, 'None'),
+    ('treatment_duration', 'Duration of Treatment: ', _ALLOWED_DURATION, 'Not applicable'),
+    ('treatment_status', 'Current Treatment Status: ', _ALLOWED_STATUS, 'Not started'),
+    ('follow_up_frequency', 'How often do you attend follow-up appointments? ', _ALLOWED_FOLLOWUP, 'Every 3 months'),
+    ('smoking', 'Do you smoke? ', None, 'No'),
+    ('alcohol', 'Do you consume alcohol? ', None, 'No'),
+    ('physical_activity', 'Physical Activity Level: ', _ALLOWED_ACTIVITY,
+     'Moderately active (moderate exercise/sports 3-5 days/week)'),
+    ('bmi_category', 'Body Mass Index (BMI) (if known):', _ALLOWED_BMI, '18.5-24.9 (Normal weight)'),
+    ('current_health', 'Current Health Status (self-assessed): ', _ALLOWED_HEALTH, 'Good'),
+)
+
 class SurvivalPredictor:
+    __slots__ = ('model_path', 'model_data', '_encoder_maps', '_unknown_codes', '_feature_idx')
+    
     def __init__(self, model_path='breast_cancer_survival_predictor.pkl'):
         self.model_path = model_path
-        self.model_data = None
-        self._load_model()
+        entry = self._get_model(model_path)
+        self.model_data = entry['model_data']
+        self._encoder_maps = entry['encoder_maps']
+        self._unknown_codes = entry['unknown_codes']
+        self._feature_idx = entry['feature_idx']
+    
+    @classmethod
+    def _get_model(cls, model_path: str) -> Dict[str, Any]:
+        """Return the shared model entry for model_path, loading it on first use"""
+        with _MODEL_CACHE_LOCK:
+            entry = _MODEL_CACHE.get(model_path)
+            if entry is None:
+                entry = _MODEL_CACHE[model_path] = cls._load_model(model_path)
+            return entry
     
-    def _load_model(self):
+    @classmethod
+    def _load_model(cls, model_path: str) -> Dict[str, Any]:
         """Load the trained survival prediction model"""
+        entry = {'model_data': None, 'encoder_maps': {}, 'unknown_codes': {}, 'feature_idx': {}}
         try:
-            if not os.path.exists(self.model_path):
-                logger.warning(f"Survival model file not found: {self.model_path}. Using mock predictions.")
-                return
+            if not os.path.exists(model_path):
+                logger.warning(f"Survival model file not found: {model_path}. Using mock predictions.")
+                return entry
             
-            self.model_data = joblib.load(self.model_path)
+            model_data = joblib.load(model_path)
+            
+            # Rows are passed as plain ndarrays in feature_columns order, so drop the
+            # DataFrame column names recorded at fit time (avoids a warning per call)
+            model = model_data['model']
+            if getattr(model, 'feature_names_in_', None) is not None:
+                model.feature_names_in_ = None
+            
+            entry.update(cls._prepare_encoders(model_data))
+            entry['model_data'] = model_data
             logger.info("Survival prediction model loaded successfully")
         except Exception as e:
             logger.error(f"Error loading survival model: {e}")
-            self.model_data = None
+        return entry
+    
+    @staticmethod
+    def _prepare_encoders(model_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Precompute label -> code lookups so encoding a row needs no LabelEncoder calls"""
+        label_encoders = model_data['label_encoders']
+        feature_columns = model_data['feature_columns']
+        
+        # tolist() gives native Python keys, which hash and compare faster than NumPy scalars
+        encoder_maps = {
+            col: dict(zip(encoder.classes_.tolist(), range(len(encoder.classes_))))
+            for col, encoder in label_encoders.items()
+        }
+        return {
+            'encoder_maps': encoder_maps,
+            # Labels not seen during training use the column's 'Unknown' encoding;
+            # None marks columns trained without an 'Unknown' class
+            'unknown_codes': {
+                col: encoder_map.get('Unknown')
+                for col, encoder_map in encoder_maps.items()
+            },
+            'feature_idx': {col: idx for idx, col in enumerate(feature_columns)}
+        }
+    
+    def _encode_row(self, patient_data: Dict[str, Any], row: np.ndarray) -> None:
+        """Encode patient data into a row ordered like the training columns.
+        
+        Raises ValueError for an unseen label in a column without an 'Unknown' class.
+        """
+        for col, value in patient_data.items():
+            idx = self._feature_idx.get(col)
+            if idx is None:
+                continue
+            encoder_map = self._encoder_maps.get(col)
+            if encoder_map is not None:
+                code = encoder_map.get(value)
+                if code is None:
+                    code = self._unknown_codes[col]
+                    if code is None:
+                        raise ValueError(f"Unseen label {value!r} for column {col!r}")
+                value = code
+            row[idx] = value
     
     def predict_survival(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
         """Predict survival percentage for a patient"""
         if self.model_data is None:
             return self._mock_survival_prediction(patient_data)
         
+        cache_key = (self.model_path, tuple(sorted(patient_data.items())))
+        with _PREDICTION_CACHE_LOCK:
+            cached = _PREDICTION_CACHE.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
+        result = self.predict_survival_batch([patient_data])[0]
+        # Mock results are random fallbacks after an error, don't pin them
+        if not result['is_mock']:
+            with _PREDICTION_CACHE_LOCK:
+                _PREDICTION_CACHE[cache_key] = result
+        return dict(result)
+    
+    def predict_survival_batch(self, patient_data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Predict survival percentages for several patients with a single model call"""
+        if self.model_data is None:
+            return [self._mock_survival_prediction(patient_data) for patient_data in patient_data_list]
+        
         try:
             model = self.model_data['model']
-            label_encoders = self.model_data['label_encoders']
             feature_columns = self.model_data['feature_columns']
             
-            # Convert patient data to dataframe
-            patient_df = pd.DataFrame([patient_data])
+            # Missing columns default to 0
+            rows = np.zeros((len(patient_data_list), len(feature_columns)), dtype=np.int64)
+            results = [None] * len(patient_data_list)
+            encoded = []
+            for index, (row, patient_data) in enumerate(zip(rows, patient_data_list)):
+                try:
+                    self._encode_row(patient_data, row)
+                    encoded.append(index)
+                except ValueError as e:
+                    # The model can't score labels it never saw, fall back for this patient only
+                    logger.error(f"Error in survival prediction: {e}")
+                    results[index] = self._mock_survival_prediction(patient_data)
             
-            # Preprocess using the same encoders
-            for col in patient_df.columns:
-                if col in label_encoders:
-                    try:
-                        patient_df[col] = label_encoders[col].transform(patient_df[col])
-                    except ValueError:
-                        # If label not seen during training, use 'Unknown' encoding
-                        patient_df[col] = label_encoders[col].transform(['Unknown'])[0]
-            
-            # Ensure all feature columns are present
-            for col in feature_columns:
-                if col not in patient_df.columns:
-                    patient_df[col] = 0  # Default value for missing columns
-            
-            # Reorder columns to match training
-            patient_df = patient_df[feature_columns]
-            
-            # Predict
-            survival_percentage = model.predict(patient_df)[0]
-            survival_percentage = max(0, min(100, survival_percentage))
-            
-            return {
-                'survival_percentage': round(survival_percentage, 1),
-                'confidence': 'high' if survival_percentage > 70 else 'medium' if survival_percentage > 50 else 'low',
-                'message': self._get_survival_message(survival_percentage),
-                'is_mock': False
-            }
+            if encoded:
+                # Predict
+                survival_percentages, confidence_indices, message_indices = _postprocess_survival(
+                    model.predict(rows[encoded])
+                )
+                
+                for index, survival_percentage, confidence_index, message_index in zip(
+                    encoded, survival_percentages.tolist(), confidence_indices.tolist(), message_indices.tolist()
+                ):
+                    results[index] = {
+                        'survival_percentage': survival_percentage,
+                        'confidence': _CONFIDENCE_LEVELS[confidence_index],
+                        'message': _SURVIVAL_MESSAGES[message_index],
+                        'is_mock': False
+                    }
+            return results
             
         except Exception as e:
             logger.error(f"Error in survival prediction: {e}")
-            return self._mock_survival_prediction(patient_data)
+            return [self._mock_survival_prediction(patient_data) for patient_data in patient_data_list]
     
     def _mock_survival_prediction(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
         """Provide mock survival prediction when model is not available"""
-        import random
-        
         # Simple heuristic based on available data
         base_survival = 75
         
         # Adjust based on stage if available
         stage = patient_data.get('Stage of Breast Cancer at Diagnosis (if applicable): ', 'Unknown')
-        stage_adjustments = {
-            'Stage I': 15,
-            'Stage II': 0,
-            'Stage III': -20,
-            'Stage IV': -40
-        }
-        
-        adjustment = stage_adjustments.get(stage, 0)
-        survival_percentage = base_survival + adjustment + random.uniform(-5, 5)
+        adjustment = _MOCK_STAGE_ADJUSTMENTS.get(stage, 0)
+        survival_percentage = base_survival + adjustment + float(_RNG.uniform(-5, 5))
         survival_percentage = max(10, min(95, survival_percentage))
         
         return {
@@ -100,232 +355,14 @@ class SurvivalPredictor:
     
     def _get_survival_message(self, survival_percentage: float) -> str:
         """Get appropriate message based on survival percentage"""
-        if survival_percentage >= 80:
-            return "Excellent prognosis with current treatment approaches"
-        elif survival_percentage >= 60:
-            return "Good prognosis with comprehensive treatment plan"
-        elif survival_percentage >= 40:
-            return "Moderate prognosis - aggressive treatment recommended"
-        else:
-            return "Requires intensive treatment and close monitoring"
+        return _SURVIVAL_MESSAGES[bisect_right(_SURVIVAL_THRESHOLDS, survival_percentage)]
     
     def map_questionnaire_to_survival_features(self, questionnaire_responses: Dict[str, Any]) -> Dict[str, Any]:
         """Map questionnaire responses to survival model features with exact field names"""
+        # One answer lookup plus one membership probe per field
+        get_answer = questionnaire_responses.get
         mapped_data = {}
-        
-        # Age mapping - exact field name match
-        age_mapping = {
-            'Under 30': 'Under 30',
-            '30-39': '30-39', 
-            '40-49': '40-49',
-            '50-59': '50-59',
-            '60-69': '60-69',
-            '70 and above': '70 and above'
-        }
-        mapped_data['Age (in years): '] = age_mapping.get(
-            questionnaire_responses.get('age_group', '40-49'), '40-49'
-        )
-        
-        # Ethnicity
-        mapped_data['Ethnicity'] = questionnaire_responses.get('ethnicity', 'Unknown')
-        
-        # Marital Status
-        mapped_data['Marital Status'] = questionnaire_responses.get('marital_status', 'Unknown')
-        
-        # Family history - exact field name match
-        mapped_data['Family History of Breast Cancer: '] = questionnaire_responses.get('family_history', 'No')
-        
-        # Menopausal status - exact field name match
-        menopausal_mapping = {
-            'Pre-menopausal': 'Pre-menopausal',
-            'Peri-menopausal': 'Peri-menopausal', 
-            'Post-menopausal': 'Post-menopausal'
-        }
-        mapped_data['Menopausal Status: '] = menopausal_mapping.get(
-            questionnaire_responses.get('menopausal_status', 'Pre-menopausal'), 'Pre-menopausal'
-        )
-        
-        # Other chronic conditions - exact field name match
-        other_conditions = questionnaire_responses.get('other_conditions', 'None')
-        if other_conditions == 'None':
-            mapped_data['Other Chronic Conditions (check all that apply): '] = 'None'
-        else:
-            mapped_data['Other Chronic Conditions (check all that apply): '] = other_conditions
-        
-        # Cancer stage - exact field name match
-        stage_mapping = {
-            'Stage I': 'Stage I',
-            'Stage II': 'Stage II', 
-            'Stage III': 'Stage III',
-            'Stage IV': 'Stage IV',
-            'Not sure': 'Stage II'  # Default to Stage II if unsure
-        }
-        mapped_data['Stage of Breast Cancer at Diagnosis (if applicable): '] = stage_mapping.get(
-            questionnaire_responses.get('cancer_stage', 'Not sure'), 'Stage II'
-        )
-        
-        # Tumor size - exact field name match
-        tumor_size_mapping = {
-            'Not sure': '2-5 cm',
-            'Less than 2 cm': 'Less than 2 cm',
-            '2-5 cm': '2-5 cm',
-            'Greater than 5 cm': 'Greater than 5 cm'
-        }
-        mapped_data['Tumor Size: '] = tumor_size_mapping.get(
-            questionnaire_responses.get('tumor_size', 'Not sure'), '2-5 cm'
-        )
-        
-        # Tumor type - exact field name match
-        tumor_type_mapping = {
-            'Invasive Ductal Carcinoma (IDC)': 'Invasive Ductal Carcinoma (IDC)',
-            'Invasive Lobular Carcinoma (ILC)': 'Invasive Lobular Carcinoma (ILC)',
-            'Ductal Carcinoma In Situ (DCIS)': 'Ductal Carcinoma In Situ (DCIS)',
-            'Other': 'Other',
-            'Not sure': 'Invasive Ductal Carcinoma (IDC)'  # Most common type
-        }
-        mapped_data['Tumor Type: '] = tumor_type_mapping.get(
-            questionnaire_responses.get('tumor_type', 'Not sure'), 'Invasive Ductal Carcinoma (IDC)'
-        )
-        
-        # Tumor grade - exact field name match
-        tumor_grade_mapping = {
-            'Grade 1 (Well-differentiated)': 'Grade 1 (Well-differentiated)',
-            'Grade 2 (Moderately differentiated)': 'Grade 2 (Moderately differentiated)',
-            'Grade 3 (Poorly differentiated)': 'Grade 3 (Poorly differentiated)',
-            'Not sure': 'Grade 2 (Moderately differentiated)'
-        }
-        mapped_data['Tumor Grade: '] = tumor_grade_mapping.get(
-            questionnaire_responses.get('tumor_grade', 'Not sure'), 'Grade 2 (Moderately differentiated)'
-        )
-        
-        # Tumor stage (same as cancer stage)
-        mapped_data['Tumor Stage: '] = stage_mapping.get(
-            questionnaire_responses.get('cancer_stage', 'Not sure'), 'Stage II'
-        )
-        
-        # Lymph node status - exact field name match
-        lymph_mapping = {
-            'Not sure': 'Unknown',
-            'Positive': 'Positive',
-            'Negative': 'Negative'
-        }
-        mapped_data['Lymph Node Status: '] = lymph_mapping.get(
-            questionnaire_responses.get('lymph_node_status', 'Not sure'), 'Unknown'
-        )
-        
-        # Receptor statuses - exact field name matches
-        receptor_mapping = {
-            'Positive': 'Positive',
-            'Negative': 'Negative', 
-            'Not sure': 'Unknown'
-        }
-        mapped_data['Estrogen Receptor (ER) Status: '] = receptor_mapping.get(
-            questionnaire_responses.get('er_status', 'Not sure'), 'Unknown'
-        )
-        mapped_data['Progesterone Receptor (PR) Status: '] = receptor_mapping.get(
-            questionnaire_responses.get('pr_status', 'Not sure'), 'Unknown'
-        )
-        mapped_data['Human Epidermal Growth Factor Receptor 2 (HER2) Status: '] = receptor_mapping.get(
-            questionnaire_responses.get('her2_status', 'Not sure'), 'Unknown'
-        )
-        
-        # Diagnosis to treatment - exact field name match
-        diagnosis_mapping = {
-            'Less than 1 month': 'Less than 1 month',
-            '1-3 months': '1-3 months',
-            '3-6 months': '3-6 months', 
-            'Over 6 months': 'Over 6 months'
-        }
-        mapped_data['Duration from Diagnosis to Commencement of Treatment: '] = diagnosis_mapping.get(
-            questionnaire_responses.get('diagnosis_to_treatment', '1-3 months'), '1-3 months'
-        )
-        
-        # Recurrence - exact field name match
-        mapped_data['Have you experienced a recurrence of breast cancer? '] = questionnaire_responses.get('recurrence', 'No')
-        
-        # Treatment types - exact field name match
-        treatment_mapping = {
-            'Surgery': 'Surgery',
-            'Chemotherapy': 'Chemotherapy',
-            'Radiation therapy': 'Radiation therapy', 
-            'Hormone therapy': 'Hormone therapy',
-            'Targeted therapy': 'Targeted therapy',
-            'Not started treatment yet': 'None'
-        }
-        treatment_type = questionnaire_responses.get('treatment_types', 'Not started treatment yet')
-        mapped_data['Type of Treatment Received (check all that apply): '] = treatment_mapping.get(treatment_type, 'None')
-        
-        # Treatment duration - exact field name match
-        duration_mapping = {
-            'Less than 3 months': 'Less than 3 months',
-            '3-6 months': '3-6 months',
-            '6-12 months': '6-12 months',
-            'Over 12 months': 'Over 12 months',
-            'Not applicable': 'Not applicable'
-        }
-        mapped_data['Duration of Treatment: '] = duration_mapping.get(
-            questionnaire_responses.get('treatment_duration', 'Not applicable'), 'Not applicable'
-        )
-        
-        # Treatment status - exact field name match
-        status_mapping = {
-            'Ongoing': 'Ongoing',
-            'Completed': 'Completed',
-            'Not started': 'Not started'
-        }
-        mapped_data['Current Treatment Status: '] = status_mapping.get(
-            questionnaire_responses.get('treatment_status', 'Not started'), 'Not started'
-        )
-        
-        # Follow-up frequency - exact field name match
-        followup_mapping = {
-            'Every month': 'Every month',
-            'Every 3 months': 'Every 3 months',
-            'Every 6 months': 'Every 6 months',
-            'Yearly': 'Yearly',
-            'Not regularly': 'Not regularly'
-        }
-        mapped_data['How often do you attend follow-up appointments? '] = followup_mapping.get(
-            questionnaire_responses.get('follow_up_frequency', 'Every 3 months'), 'Every 3 months'
-        )
-        
-        # Lifestyle factors
-        mapped_data['Do you smoke? '] = questionnaire_responses.get('smoking', 'No')
-        mapped_data['Do you consume alcohol? '] = questionnaire_responses.get('alcohol', 'No')
-        
-        # Physical activity - exact field name match
-        activity_mapping = {
-            'Sedentary (little or no exercise)': 'Sedentary (little or no exercise)',
-            'Lightly active (light exercise/sports 1-3 days/week)': 'Lightly active (light exercise/sports 1-3 days/week)',
-            'Moderately active (moderate exercise/sports 3-5 days/week)': 'Moderately active (moderate exercise/sports 3-5 days/week)',
-            'Very active (hard exercise/sports 6-7 days a week)': 'Very active (hard exercise/sports 6-7 days a week)'
-        }
-        mapped_data['Physical Activity Level: '] = activity_mapping.get(
-            questionnaire_responses.get('physical_activity', 'Moderately active (moderate exercise/sports 3-5 days/week)'),
-            'Moderately active (moderate exercise/sports 3-5 days/week)'
-        )
-        
-        # BMI - exact field name match
-        bmi_mapping = {
-            'Below 18.5 (Underweight)': 'Below 18.5 (Underweight)',
-            '18.5-24.9 (Normal weight)': '18.5-24.9 (Normal weight)',
-            '25-29.9 (Overweight)': '25-29.9 (Overweight)',
-            '30 and above (Obese)': '30 and above (Obese)',
-            'Not sure': '18.5-24.9 (Normal weight)'
-        }
-        mapped_data['Body Mass Index (BMI) (if known):'] = bmi_mapping.get(
-            questionnaire_responses.get('bmi_category', 'Not sure'), '18.5-24.9 (Normal weight)'
-        )
-        
-        # Current health - exact field name match
-        health_mapping = {
-            'Excellent': 'Excellent',
-            'Good': 'Good',
-            'Fair': 'Fair',
-            'Poor': 'Poor'
-        }
-        mapped_data['Current Health Status (self-assessed): '] = health_mapping.get(
-            questionnaire_responses.get('current_health', 'Good'), 'Good'
-        )
-        
-        return mapped_data
\ No newline at end of file
+        for response_key, feature_name, allowed, default in _FIELD_SPEC:
+            value = get_answer(response_key, default)
+            mapped_data[feature_name] = value if allowed is None or value in allowed else default
+        return mapped_data
@@ -1,23 +1,30 @@
 import os
 import uuid
+from functools import lru_cache
 from werkzeug.utils import secure_filename
+from config import Config
+
+@lru_cache(maxsize=32)
+def _extension_allowed(extension):
+    """Check a lowercased extension against the configured whitelist"""
+    return extension in Config.ALLOWED_EXTENSIONS
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    allowed_extensions = {'png', 'jpg', 'jpeg', 'bmp'}
-    return '.' in filename and \
-            filename.rsplit('.', 1)[1].lower() in allowed_extensions
+    _, dot, extension = filename.rpartition('.')
+    return bool(dot) and _extension_allowed(extension.lower())
 
-def save_uploaded_image(image_file, upload_folder):
-    """Save uploaded image and return filename"""
+def save_uploaded_image(image_data, original_filename, upload_folder):
+    """Save uploaded image bytes and return filename"""
     try:
         # Generate unique filename
-        file_extension = os.path.splitext(image_file.filename)[1]
+        file_extension = os.path.splitext(original_filename)[1]
         filename = f"{uuid.uuid4()}{file_extension}"
         filepath = os.path.join(upload_folder, filename)
         
         # Save the file
-        image_file.save(filepath)
+        with open(filepath, 'wb') as f:
+            f.write(image_data)
         
         return filename
         